@@ -0,0 +1,156 @@
+"""
+Benchmark de las implementaciones de primalidad.
+
+Mide cada motor de `is_prime.py` (y la versión `is_prime` del cuaderno de
+funciones de orden superior) sobre un conjunto fijo de cargas de trabajo y
+guarda los resultados en JSON, para poder comparar entre versiones.
+
+Uso:
+    python benchmark_primos.py --salida resultados.json --repeticiones 5
+"""
+
+import argparse
+import json
+import platform
+import random
+import time
+
+from is_prime import OraculoPrimos, es_primo, es_primo_batch, miller_rabin, método_ineficiente
+
+# Valores mayores que este se omiten para los métodos que recorren hasta n.
+LIMITE_LINEAL = 10**4
+
+LIMITE_ORACULO = 10**8
+
+
+def is_prime(n):
+    """Versión del cuaderno '2 Higher Order Functions' (bucle hasta n-1)."""
+    if n <= 1:
+        return False
+
+    for i in range(2, n):
+        if n % i == 0:
+            return False
+
+    return True
+
+
+def cargas_de_trabajo(semilla: int) -> dict:
+    """
+    Construye las cargas de trabajo estándar.
+
+    Args:
+        semilla (int): Semilla para que las muestras aleatorias sean reproducibles.
+
+    Returns:
+        dict: Nombre de la carga -> lista de enteros a evaluar.
+    """
+    rng = random.Random(semilla)
+    return {
+        "pequeños": list(range(LIMITE_LINEAL)),
+        "32_bits": [rng.randrange(1 << 31, 1 << 32) for _ in range(10_000)],
+        "64_bits": [rng.randrange(1 << 62, 1 << 63) for _ in range(10_000)],
+        "rango_denso": list(range(10**6, 10**6 + 10**5)),
+        "aleatorio": [rng.randrange(LIMITE_ORACULO) for _ in range(100_000)],
+    }
+
+
+def motores(oraculo: OraculoPrimos) -> dict:
+    """
+    Devuelve los motores a medir.
+
+    Cada motor es una función que recibe la lista completa de números, junto
+    con el mayor valor que admite (None = sin límite).
+
+    Args:
+        oraculo (OraculoPrimos): Criba ya construida para el motor de oráculo.
+
+    Returns:
+        dict: Nombre del motor -> (función, límite).
+    """
+    return {
+        "método_ineficiente": (lambda ns: [método_ineficiente(n) for n in ns], LIMITE_LINEAL),
+        "is_prime_cuaderno": (lambda ns: [is_prime(n) for n in ns], LIMITE_LINEAL),
+        "es_primo": (lambda ns: [es_primo(n) for n in ns], None),
+        "miller_rabin": (lambda ns: [miller_rabin(n) for n in ns], None),
+        "oraculo": (lambda ns: [n in oraculo for n in ns], oraculo.limite),
+        "es_primo_batch": (es_primo_batch, (1 << 63) - 1),
+    }
+
+
+def medir(funcion, numeros: list[int], repeticiones: int) -> float:
+    """
+    Mide el mejor tiempo de `repeticiones` ejecuciones tras una de calentamiento.
+
+    Args:
+        funcion: Motor a medir.
+        numeros (list[int]): Carga de trabajo.
+        repeticiones (int): Ejecuciones cronometradas.
+
+    Returns:
+        float: El menor tiempo observado, en segundos.
+    """
+    funcion(numeros)
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(numeros)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def ejecutar(repeticiones: int, semilla: int) -> dict:
+    """
+    Ejecuta todos los motores sobre todas las cargas de trabajo.
+
+    Args:
+        repeticiones (int): Ejecuciones cronometradas por combinación.
+        semilla (int): Semilla de las muestras aleatorias.
+
+    Returns:
+        dict: Informe listo para volcar a JSON.
+    """
+    inicio = time.perf_counter()
+    oraculo = OraculoPrimos(LIMITE_ORACULO)
+    construccion = time.perf_counter() - inicio
+
+    resultados = []
+    for carga, numeros in cargas_de_trabajo(semilla).items():
+        for motor, (funcion, limite) in motores(oraculo).items():
+            if limite is not None and max(numeros) > limite:
+                continue
+            segundos = medir(funcion, numeros, repeticiones)
+            resultados.append({
+                "motor": motor,
+                "carga": carga,
+                "cantidad": len(numeros),
+                "segundos": segundos,
+                "us_por_numero": segundos / len(numeros) * 1e6,
+            })
+
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": semilla,
+        "repeticiones": repeticiones,
+        "construccion_oraculo_s": construccion,
+        "limite_oraculo": LIMITE_ORACULO,
+        "resultados": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los métodos de primalidad.")
+    parser.add_argument("--salida", default="benchmark_primos.json",
+                        help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=2024)
+    args = parser.parse_args()
+
+    informe = ejecutar(args.repeticiones, args.semilla)
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(informe, archivo, ensure_ascii=False, indent=2)
+
+    for fila in informe["resultados"]:
+        print(f"{fila['carga']:>12} {fila['motor']:>20} {fila['us_por_numero']:10.3f} us/número")
@@ -1,9 +1,37 @@
 NUM_DISKS = 4
+NUM_POSTS = 3
+
+# Disks on each post (bottom to top, 0 is the smallest) to start from, e.g.
+# [[3, 0], [2, 1], []] to resume an interrupted run. None starts with every
+# disk on the first post. Only supported with 3 posts.
+INITIAL_POSITIONS = None
+
+# Repaint only the areas where disks moved instead of the whole window.
+DIRTY_RECTS = True
+
+# Turbo mode (toggled with T): while more than TURBO_THRESHOLD moves are
+# left, apply TURBO_MOVES_PER_FRAME moves per frame without animating them.
+TURBO = False
+TURBO_MOVES_PER_FRAME = 1000
+TURBO_THRESHOLD = 10
+
+# offline_render.py: frames drawn for each move, and frames rendered by a
+# worker in each task.
+FRAMES_PER_MOVE = 30
+CHUNK_FRAMES = 16
+
+# File where the time of each phase of the last PROFILE_FRAMES frames is
+# saved on exit (.json, or CSV otherwise). None disables the profiler.
+# While it runs, P shows or hides the timings on screen.
+PROFILE_OUTPUT = None
+PROFILE_FRAMES = 600
 
 
 BACKGROUND_COLOR = (12, 53, 106)
 
 DISK_VEL = 15
+# Pixels per second, the same as DISK_VEL pixels per frame at 60 fps.
+DISK_SPEED = DISK_VEL * 60
 DISK_COLORS = [(95, 134, 112),
               (255, 152, 0),
               (184, 0, 0),
@@ -1,81 +1,154 @@
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from itertools import islice
+
+# pygame greets on stdout when imported, which would end up in front of
+# the JSON statistics of --headless.
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
 import pygame
 from colour import Color
 from config import *
+from profiler import DISPLAY, DRAW, EVENTS, UPDATE, WAIT, FrameProfiler
+from solvers import frame_stewart_count, frame_stewart_moves, min_moves_from, moves_from
 
 pygame.display.set_caption('Hanoi Towers Simulator')
 
 class Disk:
-    vel = DISK_VEL
+    # Pixels per second; horizontal movements go twice as fast.
+    speed = DISK_SPEED
     UP = 1
     DOWN = 2
     LEFT = 3
     RIGHT = 4
 
-    MOVING = 10
-    QUIET = 11
-
     HEIGHT = DISK_HEIGHT
     WIDTH = DISK_WIDTH
     ADDITIONAL_WIDTH = 45
+    BORDER_RADIUS = 10
+
+    # Rounded rectangles already rasterized, by (size, color, radius).
+    sprites = {}
 
     def __init__(self, center, id_disk, color):
         self.rect = pygame.Rect((0, 0), (self.WIDTH + id_disk * self.ADDITIONAL_WIDTH, self.HEIGHT))
         self.rect.center = center
         self.color = color
-        self.movements = []
-        self.state = self.QUIET
+        self.movements = deque()
+        # Exact (float) center while moving, None when quiet.
+        self.position = None
 
     def is_moving(self):
         return len(self.movements) > 0
 
-    def move_up(self, lmt_top):
-        self.rect.y -= self.vel
+    # Advances the disk dt seconds along its queued movements. Time left
+    # over when a movement ends is used by the next one, so the path does
+    # not depend on the frame rate. Returns whether it is still moving.
+    def update(self, dt):
+        if self.position is None:
+            self.position = list(self.rect.center)
+
+        while self.movements and dt > 0:
+            direction, lmt = self.movements[0]
+            axis = 1 if direction in (self.UP, self.DOWN) else 0
+            speed = self.speed if axis == 1 else 2 * self.speed
+
+            distance = abs(lmt - self.position[axis])
+            if distance <= speed * dt:
+                self.position[axis] = lmt
+                dt -= distance / speed
+                self.movements.popleft()
+            elif lmt > self.position[axis]:
+                self.position[axis] += speed * dt
+                dt = 0
+            else:
+                self.position[axis] -= speed * dt
+                dt = 0
+
+        self.rect.center = (round(self.position[0]), round(self.position[1]))
+
+        if not self.movements:
+            self.position = None
+            return False
+
+        return True
 
-        if self.rect.centery <= lmt_top:
-            self.rect.centery = lmt_top
-            self.state = self.QUIET
+    def add_movement(self, direction, lmt):
+        self.movements.append((direction, lmt))
 
-    def move_down(self, lmt_bot):
-        self.rect.y += self.vel
+    # The disk drawn once in the display format, with its corners as a
+    # run-length encoded colorkey (much faster to blit than per-pixel
+    # alpha or than rasterizing the rounded rect again). A new one is only
+    # made if the size, color or radius change.
+    def sprite(self):
+        key = (self.rect.size, tuple(self.color), self.BORDER_RADIUS)
+        sprite = self.sprites.get(key)
 
-        if self.rect.centery >= lmt_bot:
-            self.rect.centery = lmt_bot
-            self.state = self.QUIET
+        if sprite is None:
+            transparent = (0, 0, 0) if tuple(self.color) != (0, 0, 0) else (255, 255, 255)
+            sprite = pygame.Surface(self.rect.size).convert()
+            sprite.fill(transparent)
+            pygame.draw.rect(sprite, self.color, sprite.get_rect(), border_radius=self.BORDER_RADIUS)
+            sprite.set_colorkey(transparent, pygame.RLEACCEL)
+            self.sprites[key] = sprite
 
-    def move_left(self, lmt_left):
-        self.rect.x -= 2 * self.vel
+        return sprite
 
-        if self.rect.centerx <= lmt_left:
-            self.rect.centerx = lmt_left
-            self.state = self.QUIET
+    def draw(self, surf):
+        surf.blit(self.sprite(), self.rect)
 
-    def move_right(self, lmt_right):
-        self.rect.x += 2 * self.vel
+WIDTH, HEIGHT = 1200, 800
 
-        if self.rect.centerx >= lmt_right:
-            self.rect.centerx = lmt_right
-            self.state = self.QUIET
+# ==== POSTS ====
 
-    def move(self):
-        if len(self.movements) == 0: return
+WIDTH_POST = 25
+HEIGHT_POST = 400
+COLOR_POST = (222, 143, 95)
 
-        self.state = self.MOVING
+def make_posts(n_posts):
+    posts = []
 
-        direction, lmt = self.movements[0]
+    post_spacing = WIDTH // n_posts
 
-        if direction == self.UP: self.move_up(lmt)
-        elif direction == self.DOWN: self.move_down(lmt)
-        elif direction == self.LEFT: self.move_left(lmt)
-        elif direction == self.RIGHT: self.move_right(lmt)
+    for i in range(n_posts):
+        centerx = post_spacing // 2 + post_spacing * i
+        centery = HEIGHT // 2
 
-        if self.state == self.QUIET:
-            self.movements.pop(0)
+        post = pygame.Rect((0, 0), (WIDTH_POST, HEIGHT_POST))
+        post.center = (centerx, centery)
 
-    def add_movement(self, direction, lmt):
-        self.movements.append((direction, lmt))
+        posts.append(post)
 
-    def draw(self, surf):
-        pygame.draw.rect(surf, self.color, self.rect, border_radius=10)
+    return posts
+
+# === DISKS ====
+
+# Center of a disk resting at the given level (0 is the bottom) of a post.
+def slot_center(post, level):
+    return (post.centerx, post.bottom - level * Disk.HEIGHT - Disk.HEIGHT // 2)
+
+# One Disk per disk in positions (the disks on each post, bottom to top).
+def make_disks(posts, positions):
+    colors = DISK_COLORS
+    # colors = [(95, 134, 112),
+              # (255, 152, 0),
+              # (184, 0, 0),
+              # (56, 135, 190),
+              # (195, 172, 208),
+              # (251, 236, 178)]
+
+    disks = [None] * sum(len(stack) for stack in positions)
+
+    for post_id, stack in enumerate(positions):
+        for level, i in enumerate(stack):
+            disks[i] = Disk(slot_center(posts[post_id], level), i, colors[i % 6])
+
+    return disks
 
 def move_disk(positions, disks, posts, source_post_id, target_post_id):
     id_disk = positions[source_post_id].pop(-1)
@@ -90,65 +163,102 @@ def move_disk(positions, disks, posts, source_post_id, target_post_id):
     else:
         disks[id_disk].add_movement(Disk.LEFT, target_post.centerx)
 
-    disks[id_disk].add_movement(Disk.DOWN, target_post.bottom - len(positions[target_post_id]) * Disk.HEIGHT - Disk.HEIGHT // 2)
+    disks[id_disk].add_movement(Disk.DOWN, slot_center(target_post, len(positions[target_post_id]))[1])
 
     positions[target_post_id].append(id_disk)
 
-def hanoi(n, source, target, other):
-    if n == 1:
-        return [(source, target)]
-
-    ans = []
-    ans += hanoi(n-1, source, other, target)
-    ans += [(source, target)]
-    ans += hanoi(n-1, other, target, source)
-
-    return ans
-
-def main():
-    WIDTH, HEIGHT = 1200, 800
-    surf = pygame.display.set_mode((WIDTH, HEIGHT))
-    BG_COLOR = BACKGROUND_COLOR
+    return disks[id_disk]
 
-    # ==== POSTS ====
-
-    WIDTH_POST = 25
-    HEIGHT_POST = 400
-    COLOR_POST = (222, 143, 95)
-
-    posts = []
-
-    for i in range(3):
-        centerx = 200 + 400 * i
-        centery = HEIGHT // 2
-
-        post = pygame.Rect((0, 0), (WIDTH_POST, HEIGHT_POST))
-        post.center = (centerx, centery)
-
-        posts.append(post)
+# Same as move_disk(), but the disk is put in its final slot right away.
+def place_disk(positions, disks, posts, source_post_id, target_post_id):
+    id_disk = positions[source_post_id].pop(-1)
+    disks[id_disk].rect.center = slot_center(posts[target_post_id], len(positions[target_post_id]))
 
-    # === DISKS ====
+    positions[target_post_id].append(id_disk)
 
-    n_disks = NUM_DISKS
+    return disks[id_disk]
 
-    colors = DISK_COLORS
-    # colors = [(95, 134, 112),
-              # (255, 152, 0),
-              # (184, 0, 0),
-              # (56, 135, 190),
-              # (195, 172, 208),
-              # (251, 236, 178)]
+# Moves are generated lazily: the game pulls the next one only when the
+# previous animation has finished, so nothing is precomputed.
+def hanoi(n, source, target, other):
+    if n == 0:
+        return
+
+    yield from hanoi(n-1, source, other, target)
+    yield (source, target)
+    yield from hanoi(n-1, other, target, source)
+
+# Draws the posts and the disks over the background. With area, only that
+# region is repainted (anything drawn outside it is clipped).
+def draw_board(surf, bg_color, post_color, posts, disks, area=None):
+    surf.set_clip(area)
+    surf.fill(bg_color, area)
+
+    for post in posts:
+        if area is None or post.colliderect(area):
+            pygame.draw.rect(surf, post_color, post)
+
+    surf.blits([(disk.sprite(), disk.rect) for disk in disks
+                if area is None or disk.rect.colliderect(area)], doreturn=False)
+
+    surf.set_clip(None)
+
+# Durations counted in a fixed histogram of buckets 1% wide (from 1 ns to
+# a few minutes), so memory does not grow with the number of frames.
+class DurationHistogram:
+    GROWTH = 1.01
+    BUCKETS = 2600
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * self.BUCKETS))
+        self.total = 0
+
+    def add(self, seconds):
+        bucket = int(math.log(max(seconds * 1e9, 1)) / math.log(self.GROWTH))
+        self.counts[min(bucket, self.BUCKETS - 1)] += 1
+        self.total += 1
+
+    # p50/p95/p99 in milliseconds, within 1%.
+    def percentiles_ms(self):
+        stats = {}
+
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            if self.total == 0:
+                stats[name] = None
+                continue
+
+            rank = min(self.total - 1, int(q * self.total))
+            seen = 0
+            for bucket, count in enumerate(self.counts):
+                seen += count
+                if seen > rank:
+                    stats[name] = self.GROWTH ** bucket / 1e6
+                    break
+
+        return stats
+
+# With headless=True the game runs on SDL's dummy video driver, starts
+# solving right away, is not capped to 60 fps (disks still move 1/60 s
+# per frame) and returns frame-time statistics once solved.
+def main(headless=False, n_disks=NUM_DISKS, turbo=TURBO, profile=PROFILE_OUTPUT):
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
 
-    positions = [[], [], []]
+    surf = pygame.display.set_mode((WIDTH, HEIGHT))
+    # Sprites are in the format of the previous display, if any.
+    Disk.sprites.clear()
+    BG_COLOR = BACKGROUND_COLOR
 
-    disks = []
+    posts = make_posts(NUM_POSTS)
 
-    for i in reversed(range(n_disks)):
-        disks_inserted = len(disks)
-        disks.append(Disk((posts[0].centerx, posts[0].bottom - disks_inserted * Disk.HEIGHT - Disk.HEIGHT // 2), i, colors[i % 6]))
-        positions[0].append(i)
+    if INITIAL_POSITIONS is None:
+        positions = [[] for _ in range(NUM_POSTS)]
+        positions[0] = list(reversed(range(n_disks)))
+    else:
+        positions = [list(stack) for stack in INITIAL_POSITIONS]
+        n_disks = sum(len(stack) for stack in positions)
 
-    disks.reverse()
+    disks = make_disks(posts, positions)
 
     running = True
 
@@ -156,10 +266,39 @@ def main():
 
     some_disk_is_moving = False
 
-    run_hanoi = False
-    moves_list = hanoi(n_disks, 0, 2, 1)
+    # Disks being animated, and the ones moved in the current frame.
+    active = set()
+    changed = set()
+
+    # Where each disk was last drawn; None forces a full redraw.
+    drawn_rects = None
+
+    # Seconds since the previous frame. Headless runs always advance 1/60 s
+    # per frame, so they are reproducible.
+    dt = 1 / 60
+
+    # Only checked against None when disabled, so it costs nothing.
+    profiler = FrameProfiler(PROFILE_FRAMES) if profile is not None else None
+
+    run_hanoi = headless
+    move = None
+    n_moves = 0
+    update_times = DurationHistogram()
+    render_times = DurationHistogram()
+    start = time.perf_counter()
+
+    if INITIAL_POSITIONS is not None:
+        moves = moves_from(positions, NUM_POSTS - 1)
+        total_moves = min_moves_from(positions, NUM_POSTS - 1)
+    elif NUM_POSTS == 3:
+        moves = hanoi(n_disks, 0, 2, 1)
+        total_moves = (1 << n_disks) - 1
+    else:
+        moves = frame_stewart_moves(n_disks, 0, NUM_POSTS - 1, list(range(1, NUM_POSTS - 1)))
+        total_moves = frame_stewart_count(n_disks, NUM_POSTS)
 
     while running:
+        frame_start = time.perf_counter()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -167,34 +306,123 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_a:
                     run_hanoi = not run_hanoi
+                if event.key == pygame.K_t:
+                    turbo = not turbo
+                if event.key == pygame.K_p and profiler is not None:
+                    profiler.overlay = not profiler.overlay
+                    drawn_rects = None
+
+        if profiler is not None:
+            profiler.mark(EVENTS)
+
+        if run_hanoi and not some_disk_is_moving:
+            pending = total_moves - n_moves
+
+            if turbo and pending > TURBO_THRESHOLD:
+                # Skip the animation: the disks are placed directly and only
+                # the board left after all these moves is drawn.
+                for move in islice(moves, min(TURBO_MOVES_PER_FRAME, pending - TURBO_THRESHOLD)):
+                    source, target = move
+                    changed.add(place_disk(positions, disks, posts, source, target))
+                    n_moves += 1
+            else:
+                move = next(moves, None)
+                if move is not None:
+                    source, target = move
+                    active.add(move_disk(positions, disks, posts, source, target))
+                    n_moves += 1
+
+        changed.update(active)
+        for disk in list(active):
+            if not disk.update(dt):
+                active.discard(disk)
+        some_disk_is_moving = len(active) > 0
+
+        if profiler is not None:
+            profiler.mark(UPDATE)
+
+        render_start = time.perf_counter()
+
+        if DIRTY_RECTS and drawn_rects is not None:
+            dirty = []
+            for disk in changed:
+                if disk.rect != drawn_rects[disk]:
+                    dirty.append(drawn_rects[disk].union(disk.rect))
+                    drawn_rects[disk] = disk.rect.copy()
+
+            for area in dirty:
+                draw_board(surf, BG_COLOR, COLOR_POST, posts, disks, area)
+        else:
+            dirty = None
+            draw_board(surf, BG_COLOR, COLOR_POST, posts, disks)
+            drawn_rects = {disk: disk.rect.copy() for disk in disks}
+        changed.clear()
+
+        if profiler is not None:
+            if profiler.overlay:
+                area = profiler.draw_overlay(surf)
+                if dirty is not None:
+                    dirty.append(area)
+            profiler.mark(DRAW)
+
+        pygame.display.update(dirty)
+
+        if profiler is not None:
+            profiler.mark(DISPLAY)
+
+        if headless:
+            render_end = time.perf_counter()
+            update_times.add(render_start - frame_start)
+            render_times.add(render_end - render_start)
+
+            if move is None and not some_disk_is_moving:
+                running = False
+        else:
+            dt = clock.tick(60) / 1000
 
-        if run_hanoi:
-            if not some_disk_is_moving:
-                if len(moves_list) > 0:
-                    source, target = moves_list[0]
-                    moves_list.pop(0)
-                    move_disk(positions, disks, posts, source, target)
-
-
-        some_disk_is_moving = False
-        for disk in disks:
-            disk.move()
-            if disk.is_moving():
-                some_disk_is_moving = True
-
-        surf.fill(BG_COLOR)
-
-        for post in posts:
-            pygame.draw.rect(surf, COLOR_POST, post)
-
-        for disk in disks:
-            disk.draw(surf)
-
-        pygame.display.update()
+        if profiler is not None:
+            profiler.mark(WAIT)
 
-        clock.tick(60)
+    solve_time = time.perf_counter() - start
 
     pygame.quit()
 
+    if profiler is not None:
+        profiler.dump(profile)
+
+    if headless:
+        return {
+            "disks": n_disks,
+            "posts": NUM_POSTS,
+            "moves": n_moves,
+            "turbo": turbo,
+            "frames": update_times.total,
+            "solve_time_s": solve_time,
+            "update_ms": update_times.percentiles_ms(),
+            "render_ms": render_times.percentiles_ms(),
+        }
+
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hanoi Towers Simulator")
+    parser.add_argument("--headless", action="store_true",
+                        help="Solve without a window and print frame-time statistics as JSON.")
+    parser.add_argument("--disks", type=int, default=NUM_DISKS)
+    parser.add_argument("--turbo", action="store_true", default=TURBO,
+                        help="Start in turbo mode (many moves per frame, not animated).")
+    parser.add_argument("--profile", metavar="PATH", default=PROFILE_OUTPUT,
+                        help="Time each phase of the loop and save the last frames to PATH "
+                             "(.json or .csv) on exit. P toggles the on-screen timings.")
+    parser.add_argument("--output", help="Write the JSON statistics to this file instead of stdout.")
+    args = parser.parse_args()
+
+    stats = main(headless=args.headless, n_disks=args.disks, turbo=args.turbo, profile=args.profile)
+
+    if stats is not None:
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(stats, f, indent=2)
+        else:
+            json.dump(stats, sys.stdout, indent=2)
+            print()
@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# pygame greets on stdout when imported, which would corrupt frames
+# written to stdout.
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import pygame
+from config import *
+from hanoi_game import COLOR_POST, HEIGHT, WIDTH, Disk, draw_board, make_disks, make_posts, slot_center
+from solvers import positions_after
+
+# Renders the optimal solve of n disks (3 posts, from the first to the last
+# one) to an image sequence, without a window and without playing the game
+# in real time.
+
+# ==== FRAME STATE ====
+#
+# Frame f shows move k = f // frames_per_move (0-based) at the fraction
+# (f % frames_per_move) / frames_per_move of its path, and the last frame
+# is the solved board. The board comes from positions_after(), so each
+# frame is computed on its own and any range of frames can be rendered
+# independently.
+
+def frame_count(n_disks, frames_per_move):
+    return ((1 << n_disks) - 1) * frames_per_move + 1
+
+# Point at the given fraction of the path that goes up from start, across
+# at height top and down to end. As in the game, going across is twice as
+# fast as going up or down.
+def path_point(start, end, top, fraction):
+    legs = (start[1] - top, abs(end[0] - start[0]) / 2, end[1] - top)
+    t = fraction * sum(legs)
+
+    if t <= legs[0]:
+        return (start[0], start[1] - t)
+    t -= legs[0]
+
+    if t <= legs[1]:
+        return (start[0] + 2 * t if end[0] > start[0] else start[0] - 2 * t, top)
+    t -= legs[1]
+
+    return (end[0], top + t)
+
+# Center of every disk in frame f.
+def frame_centers(n_disks, frames_per_move, posts, f):
+    k, step = divmod(f, frames_per_move)
+    positions = positions_after(n_disks, k)
+    centers = [None] * n_disks
+
+    for post_id, stack in enumerate(positions):
+        for level, disk in enumerate(stack):
+            centers[disk] = slot_center(posts[post_id], level)
+
+    if step > 0:
+        # Move k + 1 (1-based) is made by the disk given by its lowest set bit.
+        disk = ((k + 1) & -(k + 1)).bit_length() - 1
+        after = positions_after(n_disks, k + 1)
+        source = next(i for i, stack in enumerate(positions) if stack and stack[-1] == disk)
+        target = next(i for i, stack in enumerate(after) if stack and stack[-1] == disk)
+
+        x, y = path_point(centers[disk], slot_center(posts[target], len(after[target]) - 1),
+                          posts[source].top - Disk.HEIGHT // 2, step / frames_per_move)
+        centers[disk] = (round(x), round(y))
+
+    return centers
+
+# ==== WORKERS ====
+#
+# Sending a 2.9 MB frame back to the parent costs more than drawing it, so
+# the workers write their frames themselves: PNG files in the output
+# directory, or raw frames at their offset in the output file. Only a
+# stream (stdout) is written by the parent, in order.
+
+_worker = {}
+
+def _init_worker(n_disks, frames_per_move, fmt, output, digits):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    # The disk sprites are converted to the display format.
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+    # Frames are drawn on a 24-bit surface with the bytes in R, G, B order:
+    # its pixels are already raw RGB (converting a 32-bit surface with
+    # tobytes() took ~10 ms per frame) and it is faster to save as PNG.
+    surf = pygame.Surface((WIDTH, HEIGHT), 0, 24, (0xFF, 0xFF00, 0xFF0000, 0))
+    posts = make_posts(3)
+
+    _worker.update(n_disks=n_disks, frames_per_move=frames_per_move, fmt=fmt, surf=surf,
+                   posts=posts, disks=make_disks(posts, positions_after(n_disks, 0)),
+                   output=output, digits=digits)
+
+def _rgb_bytes(surf):
+    if surf.get_pitch() == WIDTH * 3:
+        return surf.get_buffer().raw
+    return pygame.image.tobytes(surf, "RGB")
+
+# Renders frames first, ..., last - 1. Returns their raw RGB bytes when
+# output is a stream, and None once they are written otherwise.
+def _render_range(first, last):
+    w = _worker
+    frames = []
+
+    for f in range(first, last):
+        for disk, center in zip(w["disks"], frame_centers(w["n_disks"], w["frames_per_move"], w["posts"], f)):
+            disk.rect.center = center
+
+        draw_board(w["surf"], BACKGROUND_COLOR, COLOR_POST, w["posts"], w["disks"])
+
+        if w["fmt"] == "rgb":
+            frames.append(_rgb_bytes(w["surf"]))
+        else:
+            pygame.image.save(w["surf"], os.path.join(w["output"], "frame_" + str(f).zfill(w["digits"]) + ".png"))
+
+    if w["fmt"] == "png":
+        return None
+    if w["output"] is None:
+        return b"".join(frames)
+
+    with open(w["output"], "r+b") as raw:
+        raw.seek(first * WIDTH * HEIGHT * 3)
+        raw.write(b"".join(frames))
+
+# ==== RENDERING ====
+
+# Renders every frame with a pool of worker processes (None = one per
+# core), in ranges of chunk frames. rgb writes all the frames, back to
+# back, to the file output ("-" is stdout); png writes one file per frame
+# to the directory output. At most two ranges per worker are pending, so
+# memory does not grow with the number of frames.
+def render(n_disks, output, fmt="png", workers=None, frames_per_move=FRAMES_PER_MOVE, chunk=CHUNK_FRAMES):
+    total = frame_count(n_disks, frames_per_move)
+    workers = workers or os.cpu_count()
+    digits = max(6, len(str(total - 1)))
+    stream = None
+
+    if fmt == "png":
+        os.makedirs(output, exist_ok=True)
+    elif output == "-":
+        stream, output = sys.stdout.buffer, None
+    else:
+        with open(output, "wb") as raw:
+            raw.truncate(total * WIDTH * HEIGHT * 3)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(n_disks, frames_per_move, fmt, output, digits)) as executor:
+        pending = deque()
+
+        for first in range(0, total, chunk):
+            pending.append(executor.submit(_render_range, first, min(first + chunk, total)))
+            if len(pending) > 2 * workers:
+                frames = pending.popleft().result()
+                if stream is not None:
+                    stream.write(frames)
+
+        while pending:
+            frames = pending.popleft().result()
+            if stream is not None:
+                stream.write(frames)
+
+    return total
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render a Hanoi Towers solve to an image sequence.")
+    parser.add_argument("output", help="Directory for png frames, or file for rgb frames ('-' is stdout).")
+    parser.add_argument("--disks", type=int, default=NUM_DISKS)
+    parser.add_argument("--format", choices=["png", "rgb"], default="png",
+                        help="png: one file per frame; rgb: raw " + str(WIDTH) + "x" + str(HEIGHT)
+                             + " RGB24 frames back to back (e.g. for ffmpeg -f rawvideo).")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core).")
+    parser.add_argument("--frames-per-move", type=int, default=FRAMES_PER_MOVE)
+    parser.add_argument("--chunk", type=int, default=CHUNK_FRAMES,
+                        help="Frames rendered by a worker in each task.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames = render(args.disks, args.output, args.format, args.workers, args.frames_per_move, args.chunk)
+    seconds = time.perf_counter() - start
+
+    print(str(frames) + " frames in " + format(seconds, ".1f") + " s ("
+          + format(frames / seconds, ".0f") + " frames/s)", file=sys.stderr)
@@ -0,0 +1,110 @@
+import csv
+import json
+import time
+from array import array
+
+import pygame
+
+# Phases of a frame of the main loop, in the order they are timed.
+EVENTS, UPDATE, DRAW, DISPLAY, WAIT = range(5)
+PHASES = ("events", "update", "draw", "display", "wait")
+
+# Times every phase of the last `size` frames with perf_counter_ns(). The
+# durations go into a fixed ring buffer (one int64 per phase and frame),
+# so recording a frame allocates nothing and memory does not grow.
+class FrameProfiler:
+    OVERLAY_COLOR = (255, 255, 255)
+    OVERLAY_BG = (0, 0, 0)
+    # The overlay text is only rebuilt every this many frames.
+    OVERLAY_REFRESH = 30
+
+    def __init__(self, size):
+        self.size = size
+        self.samples = array("q", bytes(8 * size * len(PHASES)))
+        self.frames = 0
+        self.last = time.perf_counter_ns()
+        self.overlay = False
+        self._font = None
+        self._text = None
+
+    # Closes the current phase: the time since the previous mark is stored
+    # as its duration. After WAIT, the next frame starts.
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        self.samples[(self.frames % self.size) * len(PHASES) + phase] = now - self.last
+        self.last = now
+
+        if phase == WAIT:
+            self.frames += 1
+
+    # Recorded frames, oldest first, as tuples of nanoseconds per phase.
+    def rows(self):
+        count = min(self.frames, self.size)
+        first = self.frames - count
+        n = len(PHASES)
+
+        for frame in range(first, self.frames):
+            i = (frame % self.size) * n
+            yield (frame,) + tuple(self.samples[i:i + n])
+
+    # Mean, p95 and max of each phase, in milliseconds.
+    def summary(self):
+        rows = list(self.rows())
+        stats = {}
+
+        for phase, name in enumerate(PHASES):
+            ordered = sorted(row[phase + 1] for row in rows)
+            if not ordered:
+                stats[name] = {"mean_ms": None, "p95_ms": None, "max_ms": None}
+                continue
+
+            stats[name] = {
+                "mean_ms": sum(ordered) / len(ordered) / 1e6,
+                "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] / 1e6,
+                "max_ms": ordered[-1] / 1e6,
+            }
+
+        return stats
+
+    # Writes the recorded frames as JSON (with a summary) if path ends in
+    # .json, or as CSV otherwise.
+    def dump(self, path):
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({
+                    "phases": PHASES,
+                    "frames": self.frames,
+                    "summary": self.summary(),
+                    "samples_ns": list(self.rows()),
+                }, f, indent=2)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("frame",) + tuple(name + "_ns" for name in PHASES))
+                writer.writerows(self.rows())
+
+    # Draws the mean and p95 of each phase in the top-left corner and
+    # returns the area it covers.
+    def draw_overlay(self, surf):
+        if self._font is None:
+            pygame.font.init()
+            self._font = pygame.font.Font(None, 22)
+
+        if self._text is None or self.frames % self.OVERLAY_REFRESH == 0:
+            lines = [name + ": " + format(s["mean_ms"] or 0, ".3f") + " ms (p95 " + format(s["p95_ms"] or 0, ".3f") + ")"
+                     for name, s in self.summary().items()]
+            rendered = [self._font.render(line, True, self.OVERLAY_COLOR, self.OVERLAY_BG) for line in lines]
+
+            # It never shrinks, so the new text covers the old one.
+            width = max(r.get_width() for r in rendered) + 10
+            if self._text is not None:
+                width = max(width, self._text.get_width())
+
+            self._text = pygame.Surface((width, sum(r.get_height() for r in rendered) + 10))
+            self._text.fill(self.OVERLAY_BG)
+            y = 5
+            for r in rendered:
+                self._text.blit(r, (5, y))
+                y += r.get_height()
+
+        return surf.blit(self._text, (0, 0))
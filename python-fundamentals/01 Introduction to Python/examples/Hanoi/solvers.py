@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+# ==== FRAME-STEWART (k >= 3 PEGS) ====
+#
+# To move n disks with k pegs: move the top t disks to an intermediate peg
+# using all k pegs, move the other n - t disks to the target with the
+# remaining k - 1 pegs, and move the t disks on top of them. The best t
+# for each (n, k) is memoized, so counting moves never enumerates them.
+
+@lru_cache(maxsize=None)
+def frame_stewart_split(n, k):
+    if k < 3 and n > 1:
+        raise ValueError("more than one disk needs at least 3 pegs")
+    if n <= 1:
+        return (n, 0)
+    if k == 3:
+        return ((1 << n) - 1, n - 1)
+
+    best = None
+    for t in range(1, n):
+        moves = 2 * frame_stewart_split(t, k)[0] + frame_stewart_split(n - t, k - 1)[0]
+        if best is None or moves < best[0]:
+            best = (moves, t)
+
+    return best
+
+def frame_stewart_count(n, k):
+    return frame_stewart_split(n, k)[0]
+
+# Moves (source, target) of n disks from source to target, using every peg
+# in others as an intermediate one.
+def frame_stewart_moves(n, source, target, others):
+    if n == 0:
+        return
+    if n == 1:
+        yield (source, target)
+        return
+
+    t = frame_stewart_split(n, len(others) + 2)[1]
+    middle, rest = others[0], list(others[1:])
+
+    yield from frame_stewart_moves(t, source, middle, [target] + rest)
+    yield from frame_stewart_moves(n - t, source, target, rest)
+    yield from frame_stewart_moves(t, middle, target, [source] + rest)
+
+# ==== ANY STARTING CONFIGURATION (3 PEGS) ====
+#
+# positions is a list with the disks on each peg, bottom to top, as in
+# hanoi_game.py (disk 0 is the smallest). To gather disks 0..d on a target
+# peg: if disk d is already there, just gather 0..d-1 on it; if not,
+# gather 0..d-1 on the third peg, move disk d and move the d-1 tower over
+# it. Each disk is looked at once, so the count is O(n) and the moves
+# come out in time linear in their number.
+
+def disk_pegs(positions):
+    if len(positions) != 3:
+        raise ValueError("positions must describe exactly 3 pegs")
+
+    n = sum(len(stack) for stack in positions)
+    pegs = [None] * n
+
+    for peg, stack in enumerate(positions):
+        for level, disk in enumerate(stack):
+            if not 0 <= disk < n or pegs[disk] is not None:
+                raise ValueError("disks must be 0..n-1, each on exactly one peg")
+            if level > 0 and stack[level - 1] < disk:
+                raise ValueError("a disk cannot be on top of a smaller one")
+            pegs[disk] = peg
+
+    return pegs
+
+def min_moves_from(positions, target):
+    pegs = disk_pegs(positions)
+    count = 0
+
+    for disk in reversed(range(len(pegs))):
+        if pegs[disk] != target:
+            count += 1 << disk
+            target = 3 - pegs[disk] - target
+
+    return count
+
+def moves_from(positions, target):
+    pegs = disk_pegs(positions)
+
+    def gather(disk, target):
+        if disk < 0:
+            return
+        if pegs[disk] == target:
+            yield from gather(disk - 1, target)
+            return
+
+        other = 3 - pegs[disk] - target
+        yield from gather(disk - 1, other)
+        yield (pegs[disk], target)
+        yield from frame_stewart_moves(disk, other, target, [pegs[disk]])
+
+    return gather(len(pegs) - 1, target)
+
+# ==== STATE AFTER K MOVES (3 PEGS) ====
+#
+# Disks on each peg, as in disk_pegs(), after the first k moves of the
+# optimal solve of n disks from peg 0 to peg 2. Disk d moves once, halfway
+# through the 2^(d+1) - 1 moves of the sub-tower it belongs to, so bit d
+# of k tells whether it has moved yet and the board is rebuilt from the
+# largest disk down in O(n), without going through the earlier moves.
+
+def positions_after(n, k):
+    if not 0 <= k < 1 << n:
+        raise ValueError("k must be between 0 and 2^n - 1")
+
+    positions = [[], [], []]
+    source, target, other = 0, 2, 1
+
+    for disk in reversed(range(n)):
+        half = 1 << disk
+        if k < half:
+            positions[source].append(disk)
+            target, other = other, target
+        else:
+            positions[target].append(disk)
+            k -= half
+            source, other = other, source
+
+    return positions
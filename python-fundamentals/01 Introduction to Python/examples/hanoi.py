@@ -1,20 +1,221 @@
+import mmap
+import os
+import struct
+
 moves_list = []
 
 def hanoi(n, source, target, other):
     if n == 0:
         return
-    
+
     hanoi(n-1, source, other, target)
     moves_list.append((source, target))
     hanoi(n-1, other, target, source)
 
+# Same moves as hanoi(), but yielded one at a time: memory is O(n) (the
+# recursion stack) instead of O(2^n), and there is no shared state.
+def hanoi_moves(n, source, target, other):
+    if n == 0:
+        return
+
+    yield from hanoi_moves(n-1, source, other, target)
+    yield (source, target)
+    yield from hanoi_moves(n-1, other, target, source)
+
+# Pegs numbered as in the formula below: the tower ends on peg 2 when n is
+# odd and on peg 1 when n is even.
+def _numbered_pegs(n, source, target, other):
+    return (source, other, target) if n % 2 == 1 else (source, target, other)
+
+# Moves k, k+1, ..., k+m-1 (1-based) without enumerating the ones before.
+# Move k goes from peg (k & (k-1)) % 3 to peg ((k | (k-1)) + 1) % 3.
+def hanoi_moves_range(n, k, m, source, target, other):
+    if k < 1 or m < 0 or k + m - 1 > (1 << n) - 1:
+        raise ValueError("moves must be between 1 and 2^n - 1")
+
+    pegs = _numbered_pegs(n, source, target, other)
+
+    for i in range(k, k + m):
+        yield (pegs[(i & (i-1)) % 3], pegs[((i | (i-1)) + 1) % 3])
+
+# Non-recursive version of hanoi_moves().
+def hanoi_moves_iterative(n, source, target, other):
+    yield from hanoi_moves_range(n, 1, (1 << n) - 1, source, target, other)
+
+# The k-th move (1-based) in O(n), straight from the bits of k.
+def kth_move(n, k, source, target, other):
+    return next(hanoi_moves_range(n, k, 1, source, target, other))
+
+# Disks on each peg (bottom to top, 1 is the smallest) after the first k
+# moves. Bit i-1 of k tells whether disk i has already made its move in
+# the sub-tower it belongs to, so the board is rebuilt from the largest
+# disk down in O(n).
+def state_after(n, k, source, target, other):
+    if k < 0 or k > (1 << n) - 1:
+        raise ValueError("k must be between 0 and 2^n - 1")
+
+    pegs = {source: [], target: [], other: []}
+
+    for disk in range(n, 0, -1):
+        half = 1 << (disk - 1)
+        if k < half:
+            pegs[source].append(disk)
+            target, other = other, target
+        else:
+            pegs[target].append(disk)
+            k -= half
+            source, other = other, source
+
+    return pegs
+
+# ==== PACKED MOVE FILES ====
+#
+# A move is stored in one byte as 3 * source + target, with the pegs
+# numbered 0 = source, 1 = other, 2 = target. A file is an 8-byte header
+# (magic, version, number of disks) followed by the 2^n - 1 move bytes:
+# about 1 byte per move instead of ~100 for a tuple in a list.
+
+MOVES_MAGIC = b"HANOI"
+MOVES_VERSION = 1
+MOVES_HEADER = struct.Struct("<5sBH")
+
+# Moves of the sub-towers up to this size are built in memory and then
+# copied (relabelled) into the file as whole blocks.
+BLOCK_DISKS = 20
+
+def _relabel_table(source, target, other):
+    codes = bytes(3 * a + b for a in range(3) for b in range(3))
+    peg = (source, other, target)
+    return bytes.maketrans(codes, bytes(3 * peg[a] + peg[b] for a in range(3) for b in range(3)))
+
+# Packed moves of an n-disk tower from peg 0 to peg 2. Each tower is the
+# (n-1)-tower moved to peg 1, the largest disk, and the (n-1)-tower moved
+# from peg 1 to peg 2, so it is built from relabelled copies of the last.
+def packed_moves(n):
+    to_other = _relabel_table(0, 1, 2)
+    from_other = _relabel_table(1, 2, 0)
+    moves = b""
+    for _ in range(n):
+        moves = moves.translate(to_other) + bytes([3 * 0 + 2]) + moves.translate(from_other)
+    return moves
+
+# Packed moves of an n-disk tower as a stream of blocks: a prebuilt
+# BLOCK_DISKS tower relabelled for each sub-tower, with the moves of the
+# larger disks in between. Nothing is enumerated move by move.
+def packed_move_blocks(n):
+    block = packed_moves(min(n, BLOCK_DISKS))
+    tables = {}
+
+    def blocks(n, source, target, other):
+        if n <= BLOCK_DISKS:
+            key = (source, target, other)
+            if key not in tables:
+                tables[key] = _relabel_table(source, target, other)
+            yield block.translate(tables[key])
+            return
+
+        yield from blocks(n-1, source, other, target)
+        yield bytes([3 * source + target])
+        yield from blocks(n-1, other, target, source)
+
+    return blocks(n, 0, 2, 1)
+
+def write_moves(f, n):
+    f.write(MOVES_HEADER.pack(MOVES_MAGIC, MOVES_VERSION, n))
+    for block in packed_move_blocks(n):
+        f.write(block)
+
+def write_moves_file(path, n):
+    with open(path, "wb") as f:
+        write_moves(f, n)
+
+# Read-only, zero-copy view of a file written by write_moves_file().
+# Moves are returned as (source, target) using the given peg labels.
+class HanoiMoveFile:
+    def __init__(self, path, source=0, target=2, other=1):
+        with open(path, "rb") as f:
+            # Too short for a header (mmap cannot even map an empty file).
+            if os.fstat(f.fileno()).st_size < MOVES_HEADER.size:
+                raise ValueError(path + " is not a Hanoi moves file")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n = MOVES_HEADER.unpack_from(self._map)
+        if magic != MOVES_MAGIC or version != MOVES_VERSION:
+            self._map.close()
+            raise ValueError(path + " is not a Hanoi moves file")
+        if len(self._map) != MOVES_HEADER.size + (1 << self.n) - 1:
+            self._map.close()
+            raise ValueError(path + " is truncated")
+
+        self.moves = memoryview(self._map)[MOVES_HEADER.size:]
+        peg = (source, other, target)
+        self._decode = [(peg[code // 3], peg[code % 3]) for code in range(9)]
+
+    def __len__(self):
+        return len(self.moves)
+
+    # A move, or a list of moves for a slice.
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self._decode[code] for code in self.moves[k]]
+        return self._decode[self.moves[k]]
+
+    def __iter__(self):
+        decode = self._decode
+        for code in self.moves:
+            yield decode[code]
+
+    def close(self):
+        self.moves.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ==== COMMAND LINE ====
+
+def move_count(n):
+    return (1 << n) - 1
+
+# Text output, written in large pre-joined chunks instead of one print()
+# per move.
+def write_text(f, n, source='A', target='C', other='B'):
+    peg = (source, other, target)
+    lines = [('Mover desde ' + str(peg[code // 3]) + ' hasta ' + str(peg[code % 3]) + '\n').encode()
+             for code in range(9)]
+
+    f.write(('Cantidad de movimientos: ' + str(move_count(n)) + '\n').encode())
+    for block in packed_move_blocks(n):
+        f.write(b''.join(map(lines.__getitem__, block)))
+
 if __name__ == "__main__":
-    n_disks = int(input("Nº de discos: "))
+    import argparse
+    import sys
 
-    hanoi(n_disks, 'A', 'C', 'B')
+    parser = argparse.ArgumentParser(description="Torres de Hanoi.")
+    parser.add_argument("n_disks", type=int, nargs="?",
+                        help="Nº de discos (si se omite, se pregunta).")
+    parser.add_argument("--mode", choices=["text", "binary", "count"], default="text",
+                        help="text: un movimiento por línea; binary: un byte por "
+                             "movimiento (formato de write_moves_file); count: solo "
+                             "la cantidad de movimientos.")
+    args = parser.parse_args()
 
-    print("Cantidad de movimientos: " + str(len(moves_list)))
+    n_disks = args.n_disks
+    if n_disks is None:
+        if args.mode == "binary":
+            # The prompt must not end up at the start of the binary output.
+            print("Nº de discos: ", end="", file=sys.stderr, flush=True)
+            n_disks = int(input())
+        else:
+            n_disks = int(input("Nº de discos: "))
 
-    for move in moves_list:
-        source, target = move
-        print('Mover desde ' + str(source) + ' hasta ' + str(target))
+    if args.mode == "count":
+        print("Cantidad de movimientos: " + str(move_count(n_disks)))
+    elif args.mode == "binary":
+        write_moves(sys.stdout.buffer, n_disks)
+    else:
+        write_text(sys.stdout.buffer, n_disks)
@@ -14,10 +14,59 @@ def sierpienski(n):
 
     return fig
 
+# ==== ROW BY ROW ====
+#
+# Row r of sierpienski(n) has r + 1 cells, separated by spaces. Cell c is
+# a star when C(r, c) is odd, that is, when (c & r) == c: the stars are
+# the submasks of r. Going through the bits of r from the lowest, each
+# set bit doubles the submasks found so far (the row becomes two copies
+# side by side) and each unset bit just centers the row in a wider one,
+# so row r is built straight from r, without the rows before it.
+
+def sierpinski_row(n, r):
+    if not 0 <= r < 1 << n:
+        raise ValueError("r must be between 0 and 2^n - 1")
+
+    row = "*"
+    for k in range(n):
+        if r >> k & 1:
+            row = row + " " + row
+        else:
+            pad = " " * (1 << k)
+            row = pad + row + pad
+
+    return row
+
+# The rows of sierpienski(n), one at a time: memory is one row, O(2^n),
+# instead of the whole figure, O(4^n).
+def sierpinski_rows(n):
+    for r in range(1 << n):
+        yield sierpinski_row(n, r)
+
+# Writes sierpienski(n), one row per line, to the binary file f in blocks
+# of about block_size bytes instead of one write per row.
+def write_sierpinski(f, n, block_size=1 << 20):
+    block = []
+    size = 0
+
+    for row in sierpinski_rows(n):
+        block.append(row)
+        size += len(row) + 1
+
+        if size >= block_size:
+            block.append("")
+            f.write("\n".join(block).encode("ascii"))
+            block = []
+            size = 0
+
+    if block:
+        block.append("")
+        f.write("\n".join(block).encode("ascii"))
+
 if __name__ == "__main__":
-    n = int(input("Size: "))
-    fig = sierpienski(n)
+    import sys
 
-    for line in fig:
-        print(line)
+    n = int(input("Size: "))
+    sys.stdout.flush()
+    write_sierpinski(sys.stdout.buffer, n)
 